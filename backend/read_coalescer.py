@@ -0,0 +1,74 @@
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from typing import Optional
+import json
+import time
+import asyncio
+
+
+class ReadCoalescer:
+    """Single-flight layer with a short micro-cache for hot read endpoints.
+
+    Concurrent reads with the same key share one in-flight query and its
+    JSON-encoded result. Finished results stay cached for `ttl` seconds or
+    until a write invalidates them; at most `max_entries` are kept.
+    """
+
+    def __init__(self, ttl: float, enabled: bool = True, max_entries: int = 1024):
+        self.ttl = ttl
+        self.enabled = enabled
+        self.max_entries = max_entries
+        self._inflight = {}
+        self._cache = {}
+
+    async def get(self, key: tuple, query):
+        """Return encoded JSON bytes for `key`, running `query` at most once."""
+        if not self.enabled:
+            return self._encode(await run_in_threadpool(query))
+
+        cached = self._cache.get(key)
+        if cached:
+            if cached[0] > time.monotonic():
+                return cached[1]
+            del self._cache[key]
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._run(key, query))
+            self._inflight[key] = task
+        # Shield so one disconnecting client doesn't cancel the shared query
+        return await asyncio.shield(task)
+
+    async def _run(self, key: tuple, query):
+        try:
+            body = self._encode(await run_in_threadpool(query))
+            # invalidate() unregisters in-flight tasks, so only a result that is
+            # still current for its own key gets cached
+            if self._inflight.get(key) is asyncio.current_task() and self.ttl > 0:
+                self._store(key, body)
+            return body
+        finally:
+            if self._inflight.get(key) is asyncio.current_task():
+                del self._inflight[key]
+
+    def _store(self, key: tuple, body: bytes):
+        if len(self._cache) >= self.max_entries:
+            now = time.monotonic()
+            for stale_key in [k for k, (expires_at, _) in self._cache.items() if expires_at <= now]:
+                del self._cache[stale_key]
+        self._cache.pop(key, None)
+        while len(self._cache) >= self.max_entries:
+            # Still full of live entries: evict the oldest
+            del self._cache[next(iter(self._cache))]
+        self._cache[key] = (time.monotonic() + self.ttl, body)
+
+    def invalidate(self, kind: Optional[str] = None, ident: Optional[str] = None):
+        """Drop cached and in-flight reads matching `kind` (and `ident`), or all."""
+        for store in (self._cache, self._inflight):
+            for key in list(store):
+                if kind is None or (key[0] == kind and (ident is None or key[1:2] == (ident,))):
+                    del store[key]
+
+    @staticmethod
+    def _encode(payload) -> bytes:
+        return json.dumps(jsonable_encoder(payload), ensure_ascii=False).encode("utf-8")
@@ -1,5 +1,6 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response
 from pydantic import BaseModel
 from typing import List, Optional
 import os
@@ -9,6 +10,7 @@ import random
 import uuid
 from pymongo import MongoClient
 import re
+from read_coalescer import ReadCoalescer
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -37,6 +39,15 @@ participants_collection.create_index([("giveaway_id", 1), ("username", 1)], uniq
 giveaways_collection = db.giveaways
 chat_messages_collection = db.chat_messages
 
+# Read coalescing settings
+READ_COALESCING_ENABLED = os.environ.get('READ_COALESCING', '1') != '0'
+READ_CACHE_TTL = float(os.environ.get('READ_CACHE_TTL', '0.5'))
+
+read_coalescer = ReadCoalescer(READ_CACHE_TTL, enabled=READ_COALESCING_ENABLED)
+
+def json_response(body: bytes) -> Response:
+    return Response(content=body, media_type="application/json")
+
 # Pydantic models
 class ChatMessage(BaseModel):
     id: str = None
@@ -126,6 +137,7 @@ async def create_giveaway(giveaway_data: GiveawayCreate):
         }
         
         giveaways_collection.insert_one(giveaway)
+        read_coalescer.invalidate()
         
         logger.info(f"Created giveaway for channel: {channel_name}")
         return Giveaway(**giveaway)
@@ -136,13 +148,16 @@ async def create_giveaway(giveaway_data: GiveawayCreate):
 # Get active giveaway
 @app.get("/api/giveaway/active")
 async def get_active_giveaway():
-    try:
+    def query():
         giveaway = giveaways_collection.find_one({"is_active": True}, sort=[("created_at", -1)])
         if not giveaway:
             return None
-        
+
         giveaway["_id"] = str(giveaway["_id"])
         return giveaway
+
+    try:
+        return json_response(await read_coalescer.get(("active_giveaway",), query))
     except Exception as e:
         logger.error(f"Error getting active giveaway: {e}")
         raise HTTPException(status_code=500, detail="Failed to get active giveaway")
@@ -177,6 +192,7 @@ async def process_chat_message(chat_msg: TwitchChatMessage):
         }
         
         chat_messages_collection.insert_one(chat_message)
+        read_coalescer.invalidate("channel_stats", giveaway["channel_name"].lower())
         
         # Add participant if keyword message
         if is_keyword_message:
@@ -200,6 +216,8 @@ async def process_chat_message(chat_msg: TwitchChatMessage):
                     {"id": giveaway_id},
                     {"$inc": {"participants_count": 1}}
                 )
+                read_coalescer.invalidate("participants", giveaway_id)
+                read_coalescer.invalidate("active_giveaway")
                 
                 logger.info(f"Added participant: {username} to giveaway {giveaway_id}")
                 return {"message": "Participant added", "is_participant": True}
@@ -213,12 +231,14 @@ async def process_chat_message(chat_msg: TwitchChatMessage):
 # Get participants
 @app.get("/api/giveaway/{giveaway_id}/participants")
 async def get_participants(giveaway_id: str):
-    try:
-        participants = list(participants_collection.find(
+    def query():
+        return list(participants_collection.find(
             {"giveaway_id": giveaway_id},
             {"_id": 0}
         ).sort("joined_at", 1))
-        return participants
+
+    try:
+        return json_response(await read_coalescer.get(("participants", giveaway_id), query))
     except Exception as e:
         logger.error(f"Error getting participants: {e}")
         raise HTTPException(status_code=500, detail="Failed to get participants")
@@ -254,6 +274,7 @@ async def select_winner(giveaway_id: str):
             "giveaway_id": giveaway_id
         }
         chat_messages_collection.insert_one(winner_msg)
+        read_coalescer.invalidate()
         
         logger.info(f"Selected winner: {winner} for giveaway {giveaway_id}")
         return {"winner": winner}
@@ -273,6 +294,8 @@ async def stop_giveaway(giveaway_id: str):
         if result.matched_count == 0:
             raise HTTPException(status_code=404, detail="Giveaway not found")
         
+        read_coalescer.invalidate()
+        
         logger.info(f"Stopped giveaway: {giveaway_id}")
         return {"message": "Giveaway stopped"}
     except Exception as e:
@@ -304,6 +327,7 @@ async def clear_participants(giveaway_id: str):
             {"id": giveaway_id},
             {"$set": {"participants_count": 0, "winner": None}}
         )
+        read_coalescer.invalidate()
         
         logger.info(f"Cleared participants for giveaway: {giveaway_id}")
         return {"message": "Participants cleared"}
@@ -314,20 +338,20 @@ async def clear_participants(giveaway_id: str):
 # Get channel statistics
 @app.get("/api/channel/{channel_name}/stats")
 async def get_channel_stats(channel_name: str):
-    try:
+    def query():
         # Get active giveaway for channel
         giveaway = giveaways_collection.find_one({
             "channel_name": channel_name.lower(),
             "is_active": True
         })
-        
+
         if not giveaway:
             return {"message": "No active giveaway for this channel"}
-        
+
         # Get stats
         participants_count = participants_collection.count_documents({"giveaway_id": giveaway["id"]})
         messages_count = chat_messages_collection.count_documents({"giveaway_id": giveaway["id"]})
-        
+
         return {
             "giveaway_id": giveaway["id"],
             "channel_name": channel_name,
@@ -336,7 +360,10 @@ async def get_channel_stats(channel_name: str):
             "keyword": giveaway["keyword"],
             "winner": giveaway.get("winner")
         }
-        
+
+    try:
+        key = ("channel_stats", channel_name.lower(), channel_name)
+        return json_response(await read_coalescer.get(key, query))
     except Exception as e:
         logger.error(f"Error getting channel stats: {e}")
         raise HTTPException(status_code=500, detail="Failed to get channel stats")
@@ -348,6 +375,7 @@ async def clear_all_data():
         giveaways_collection.delete_many({})
         participants_collection.delete_many({})
         chat_messages_collection.delete_many({})
+        read_coalescer.invalidate()
         return {"message": "All data cleared"}
     except Exception as e:
         logger.error(f"Error clearing data: {e}")
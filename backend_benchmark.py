@@ -0,0 +1,167 @@
+"""Benchmark read coalescing on the hot polling endpoints.
+
+Runs 500 concurrent pollers against /api/giveaway/active, /participants and
+/channel/{name}/stats (calling the route handlers in-process) while a chat
+feed keeps writing, once with coalescing disabled and once enabled, and
+compares the MongoDB read commands per second issued by the pollers.
+
+Requires a running MongoDB at MONGO_URL. The handlers are pointed at a
+separate database (--db-name, default twitch_giveaway_benchmark) which is
+reset between rounds; do not point it at the database of a live deployment,
+since the benchmark giveaway would become the active one for real clients.
+
+    python backend_benchmark.py [--pollers 500] [--duration 10]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import threading
+import time
+import uuid
+
+from pymongo import MongoClient, monitoring
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+import server  # noqa: E402
+
+READ_COMMANDS = {"find", "aggregate", "count", "getMore"}
+
+
+class PollerReadCounter(monitoring.CommandListener):
+    """Count read commands issued off the event loop thread.
+
+    Poller queries always run in the threadpool (with or without coalescing),
+    while the chat feed's lookups run inline on the loop thread, so only the
+    pollers' reads are counted.
+    """
+
+    def __init__(self):
+        self.loop_thread = threading.get_ident()
+        self.reads = 0
+        self._lock = threading.Lock()
+
+    def started(self, event):
+        if event.command_name in READ_COMMANDS and threading.get_ident() != self.loop_thread:
+            with self._lock:
+                self.reads += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+def use_database(mongo_client, db_name):
+    """Point the server's collections at a dedicated client and database."""
+    bench_db = mongo_client[db_name]
+    server.participants_collection = bench_db.participants
+    server.participants_collection.create_index([("giveaway_id", 1), ("username", 1)], unique=True)
+    server.giveaways_collection = bench_db.giveaways
+    server.chat_messages_collection = bench_db.chat_messages
+
+
+async def poller(giveaway_id, channel, deadline, interval, stats):
+    while time.monotonic() < deadline:
+        await server.get_active_giveaway()
+        await server.get_participants(giveaway_id)
+        await server.get_channel_stats(channel)
+        stats["requests"] += 3
+        await asyncio.sleep(interval)
+
+
+async def chat_feed(channel, keyword, deadline, rate):
+    i = 0
+    while time.monotonic() < deadline:
+        message = keyword if i % 5 == 0 else f"hello {i}"
+        await server.process_chat_message(server.TwitchChatMessage(
+            username=f"bench_user_{i}",
+            message=message,
+            channel=channel,
+            keyword=keyword,
+        ))
+        i += 1
+        await asyncio.sleep(1 / rate)
+    return i
+
+
+async def run_round(coalescing, giveaway_id, channel, keyword, counter, args):
+    # Start every round from the same empty participant list and chat
+    await server.clear_participants(giveaway_id)
+    server.chat_messages_collection.delete_many({"giveaway_id": giveaway_id})
+    server.read_coalescer.enabled = coalescing
+    server.read_coalescer.invalidate()
+
+    stats = {"requests": 0}
+    counter.reads = 0
+    started = time.monotonic()
+    deadline = started + args.duration
+
+    feed = asyncio.ensure_future(chat_feed(channel, keyword, deadline, args.write_rate))
+    await asyncio.gather(*(
+        poller(giveaway_id, channel, deadline, args.interval, stats)
+        for _ in range(args.pollers)
+    ))
+    writes = await feed
+
+    elapsed = time.monotonic() - started
+    return {
+        "db_ops_per_sec": counter.reads / elapsed,
+        "requests_per_sec": stats["requests"] / elapsed,
+        "chat_messages": writes,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pollers", type=int, default=500)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--interval", type=float, default=0.1, help="seconds between polls per poller")
+    parser.add_argument("--write-rate", type=float, default=20.0, help="chat messages per second")
+    parser.add_argument("--db-name", default="twitch_giveaway_benchmark")
+    args = parser.parse_args()
+
+    if args.db_name == server.db.name:
+        print(f"❌ Refusing to benchmark against the server database '{args.db_name}'")
+        return 1
+
+    counter = PollerReadCounter()
+    bench_client = MongoClient(server.MONGO_URL, event_listeners=[counter])
+    use_database(bench_client, args.db_name)
+
+    channel = f"bench_{uuid.uuid4().hex[:8]}"
+    keyword = "!join"
+    giveaway = await server.create_giveaway(server.GiveawayCreate(
+        stream_url=f"https://twitch.tv/{channel}",
+        channel_name=channel,
+        keyword=keyword,
+    ))
+
+    print(f"🚀 {args.pollers} pollers, {args.duration:.0f}s per round, database {args.db_name}")
+    results = {}
+    try:
+        for coalescing in (False, True):
+            label = "with coalescing" if coalescing else "without coalescing"
+            results[label] = await run_round(coalescing, giveaway.id, channel, keyword, counter, args)
+            r = results[label]
+            print(f"   {label:<20} db ops/s: {r['db_ops_per_sec']:>9.1f}   "
+                  f"requests/s: {r['requests_per_sec']:>9.1f}   chat messages: {r['chat_messages']}")
+    finally:
+        server.giveaways_collection.delete_many({"id": giveaway.id})
+        server.participants_collection.delete_many({"giveaway_id": giveaway.id})
+        server.chat_messages_collection.delete_many({"giveaway_id": giveaway.id})
+        server.read_coalescer.enabled = server.READ_COALESCING_ENABLED
+        server.read_coalescer.invalidate()
+        bench_client.close()
+
+    without = results["without coalescing"]["db_ops_per_sec"]
+    with_ = results["with coalescing"]["db_ops_per_sec"]
+    if with_ > 0:
+        print(f"📊 DB ops reduced {without / with_:.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
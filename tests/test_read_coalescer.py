@@ -0,0 +1,140 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
+
+from read_coalescer import ReadCoalescer  # noqa: E402
+
+
+class CountingQuery:
+    """Stub query that counts calls and can be held open until released."""
+
+    def __init__(self, result=None, block=False):
+        self.calls = 0
+        self.result = result if result is not None else {"ok": True}
+        self.release = threading.Event()
+        if not block:
+            self.release.set()
+
+    def __call__(self):
+        self.calls += 1
+        self.release.wait(5)
+        return self.result
+
+
+class ReadCoalescerTest(unittest.IsolatedAsyncioTestCase):
+    async def test_concurrent_calls_share_one_query(self):
+        coalescer = ReadCoalescer(ttl=1)
+        query = CountingQuery(block=True)
+
+        pending = asyncio.gather(*(coalescer.get(("participants", "g1"), query) for _ in range(100)))
+        await asyncio.sleep(0.05)
+        query.release.set()
+        results = await pending
+
+        self.assertEqual(query.calls, 1)
+        self.assertEqual(set(results), {b'{"ok": true}'})
+        self.assertEqual(coalescer._inflight, {})
+
+    async def test_cache_hit_within_ttl_and_rerun_after(self):
+        coalescer = ReadCoalescer(ttl=0.1)
+        query = CountingQuery()
+
+        await coalescer.get(("active_giveaway",), query)
+        await coalescer.get(("active_giveaway",), query)
+        self.assertEqual(query.calls, 1)
+
+        await asyncio.sleep(0.15)
+        await coalescer.get(("active_giveaway",), query)
+        self.assertEqual(query.calls, 2)
+
+    async def test_expired_entries_are_evicted(self):
+        coalescer = ReadCoalescer(ttl=0.05, max_entries=10)
+        for i in range(10):
+            await coalescer.get(("channel_stats", f"c{i}", f"c{i}"), CountingQuery())
+        self.assertEqual(len(coalescer._cache), 10)
+
+        await asyncio.sleep(0.1)
+        await coalescer.get(("channel_stats", "c0", "c0"), CountingQuery())
+        await coalescer.get(("channel_stats", "new", "new"), CountingQuery())
+        self.assertEqual(len(coalescer._cache), 2)
+
+    async def test_cache_is_capped(self):
+        coalescer = ReadCoalescer(ttl=10, max_entries=5)
+        for i in range(20):
+            await coalescer.get(("channel_stats", f"c{i}", f"c{i}"), CountingQuery())
+        self.assertEqual(len(coalescer._cache), 5)
+        self.assertIn(("channel_stats", "c19", "c19"), coalescer._cache)
+
+    async def test_key_specific_invalidate_keeps_other_keys(self):
+        coalescer = ReadCoalescer(ttl=10)
+        stats, participants = CountingQuery(), CountingQuery()
+
+        await coalescer.get(("channel_stats", "chan", "Chan"), stats)
+        await coalescer.get(("participants", "g1"), participants)
+        coalescer.invalidate("channel_stats", "chan")
+        await coalescer.get(("channel_stats", "chan", "Chan"), stats)
+        await coalescer.get(("participants", "g1"), participants)
+
+        self.assertEqual(stats.calls, 2)
+        self.assertEqual(participants.calls, 1)
+
+    async def test_invalidate_in_flight_is_not_cached(self):
+        coalescer = ReadCoalescer(ttl=10)
+        query = CountingQuery(block=True)
+
+        pending = asyncio.ensure_future(coalescer.get(("participants", "g1"), query))
+        await asyncio.sleep(0.05)
+        coalescer.invalidate("participants", "g1")
+        query.release.set()
+        await pending
+
+        self.assertNotIn(("participants", "g1"), coalescer._cache)
+        await coalescer.get(("participants", "g1"), query)
+        self.assertEqual(query.calls, 2)
+
+    async def test_unrelated_invalidate_in_flight_still_caches(self):
+        coalescer = ReadCoalescer(ttl=10)
+        query = CountingQuery(block=True)
+
+        pending = asyncio.ensure_future(coalescer.get(("participants", "g1"), query))
+        await asyncio.sleep(0.05)
+        coalescer.invalidate("channel_stats", "chan")
+        query.release.set()
+        await pending
+
+        self.assertIn(("participants", "g1"), coalescer._cache)
+
+    async def test_exception_clears_inflight(self):
+        coalescer = ReadCoalescer(ttl=10)
+
+        def failing_query():
+            time.sleep(0.02)
+            raise RuntimeError("mongo down")
+
+        results = await asyncio.gather(
+            *(coalescer.get(("active_giveaway",), failing_query) for _ in range(3)),
+            return_exceptions=True,
+        )
+
+        self.assertTrue(all(isinstance(r, RuntimeError) for r in results))
+        self.assertEqual(coalescer._inflight, {})
+        self.assertEqual(coalescer._cache, {})
+
+    async def test_disabled_bypasses_layer(self):
+        coalescer = ReadCoalescer(ttl=10, enabled=False)
+        query = CountingQuery()
+
+        await asyncio.gather(*(coalescer.get(("active_giveaway",), query) for _ in range(5)))
+
+        self.assertEqual(query.calls, 5)
+        self.assertEqual(coalescer._cache, {})
+        self.assertEqual(coalescer._inflight, {})
+
+
+if __name__ == "__main__":
+    unittest.main()